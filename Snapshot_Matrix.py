@@ -0,0 +1,279 @@
+from datetime import datetime, date, timedelta
+import scipy.sparse as sp
+import pandas as pd
+import networkx as nx
+import numpy as np
+
+def temporal_edge_list(G, time_attr='time', weight=None):
+    '''Function to extract the temporal edge list of a graph.
+
+       Input: G - the graph, time_attr - the attribute storing the time information, weight - the edge attribute to use as weight (None counts each edge as 1).
+
+       Output: A list of [u, v, time, weight] edges.
+    '''
+
+    # Read every edge with its time and (optional) weight attribute
+    return [[u, v, data[time_attr], data.get(weight, 1) if weight is not None else 1]
+            for u, v, data in G.edges(data=True)]
+
+def normalise_time(time):
+    '''Function to convert a time value into a type the snapshots can bucket.
+
+       Input: time - a datetime/Timestamp, a date, a numpy datetime64 or an integer time (e.g. a day number or year).
+
+       Output: The time as a datetime, a date or an int.
+    '''
+
+    # Missing times (pandas or numpy NaT, None, NaN) cannot be placed in any snapshot
+    if np.ndim(time) == 0 and pd.isnull(time):
+        raise ValueError('missing time ({!r}) in the edge list'.format(time))
+
+    # numpy datetimes come from df['Date'].to_numpy() on the cleaned pickles
+    if isinstance(time, np.datetime64):
+        return pd.Timestamp(time)
+
+    # datetime is a subclass of date, so both are kept as they are
+    if isinstance(time, date):
+        return time
+
+    # Integer times such as the day_number or Year columns
+    if isinstance(time, (int, np.integer)) and not isinstance(time, (bool, np.bool_)):
+        return int(time)
+
+    raise TypeError('unsupported time type {}, expected a datetime, date, numpy datetime64 or int'.format(type(time).__name__))
+
+def snapshot_key(time, resolution, season_start=7):
+    '''Function to map a time to the day or season it belongs to.
+
+       Input: time - a datetime, date or integer time (see normalise_time), resolution - 'day', 'matchday' or 'season',
+              season_start - the month a season starts in (7 for football, 1 for calendar years).
+
+       Output: The calendar date (or the integer time) for 'day' and 'matchday', the starting year of the season for 'season'.
+    '''
+
+    # Integer times carry no calendar information, so they can only be used as days
+    if isinstance(time, int):
+        if resolution != 'day':
+            raise ValueError("integer times can only be bucketed with resolution 'day', got {!r}".format(resolution))
+        return time
+
+    # A season is labelled by the year it starts in, e.g. 2023 for July 2023 - June 2024 when season_start is 7.
+    # With season_start=1 this is the calendar year, the same as the Year column of the cleaned datasets.
+    if resolution == 'season':
+        return time.year if time.month >= season_start else time.year - 1
+
+    # Days and matchdays are both keyed by the calendar date
+    return time.date() if isinstance(time, datetime) else time
+
+def snapshot_labels(times, resolution='day', season_start=7, matchday_gap=1):
+    '''Function to order the snapshots covering a list of times and find the snapshot of each time.
+
+       Input: times - the times of the edges, resolution - 'day', 'matchday' or 'season',
+              season_start - the month a season starts in (7 for football, 1 for calendar years),
+              matchday_gap - the largest number of days between two played dates of the same matchday.
+
+       Output: A sorted list with the label of each snapshot and a list with the snapshot index of each time.
+
+       A matchday groups played dates that follow each other within matchday_gap days, so a round played on
+       Tuesday and Wednesday is one snapshot (labelled by its first date) while the next week starts a new one.
+    '''
+
+    if resolution not in ('day', 'matchday', 'season'):
+        raise ValueError("resolution must be 'day', 'matchday' or 'season', got {!r}".format(resolution))
+    if not 1 <= season_start <= 12:
+        raise ValueError('season_start must be a month between 1 and 12, got {!r}'.format(season_start))
+
+    # Bucket every time, integer and calendar times cannot be mixed
+    keys = [snapshot_key(normalise_time(time), resolution, season_start) for time in times]
+    if len(set(isinstance(key, int) for key in keys)) > 1:
+        raise TypeError('cannot mix integer times with calendar times')
+
+    # Only the buckets that contain at least one edge
+    active = sorted(set(keys))
+    if not active:
+        return [], []
+
+    if resolution == 'day':
+        # Days are consecutive calendar days, so empty days get an empty snapshot
+        if isinstance(active[0], date):
+            labels = [active[0] + timedelta(days=i) for i in range((active[-1] - active[0]).days + 1)]
+        else:
+            labels = list(range(active[0], active[-1] + 1))
+        label_index = {label: t for t, label in enumerate(labels)}
+        return labels, [label_index[key] for key in keys]
+
+    if resolution == 'season':
+        # Seasons only keep the ones that were played in
+        label_index = {label: t for t, label in enumerate(active)}
+        return active, [label_index[key] for key in keys]
+
+    # Start a new matchday whenever the gap to the previous played date is too large
+    labels = [active[0]]
+    date_index = {active[0]: 0}
+    for previous, current in zip(active, active[1:]):
+        if (current - previous).days > matchday_gap:
+            labels.append(current)
+        date_index[current] = len(labels) - 1
+
+    return labels, [date_index[key] for key in keys]
+
+def build_snapshots(edges, resolution='day', directed=True, nodes=None, season_start=7, matchday_gap=1):
+    '''Function to convert a temporal edge list into a stack of sparse adjacency snapshots.
+
+       Input: edges - a list of [u, v, time] or [u, v, time, weight] edges, resolution - 'day', 'matchday' or 'season',
+              directed - whether the edges are directed, nodes - an optional node ordering (defaults to the sorted nodes),
+              season_start - the month a season starts in, matchday_gap - the largest gap in days within a matchday (see snapshot_labels).
+
+       Output: A list of CSR adjacency matrices (one per snapshot), the list of nodes (row/column order) and the list of snapshot labels.
+    '''
+
+    # Fix the node ordering so that every snapshot shares the same indices
+    if nodes is None:
+        nodes = sorted(set(edge[0] for edge in edges) | set(edge[1] for edge in edges))
+    node_index = {node: i for i, node in enumerate(nodes)}
+    N = len(nodes)
+
+    # Every edge endpoint needs a row and column in the given node ordering
+    missing = set(edge[0] for edge in edges if edge[0] not in node_index) | set(edge[1] for edge in edges if edge[1] not in node_index)
+    if missing:
+        raise ValueError('edge endpoints missing from nodes: {}'.format(sorted(missing, key=str)))
+
+    # Order the snapshots and find the snapshot of each edge
+    labels, snapshot_index = snapshot_labels([edge[2] for edge in edges], resolution, season_start, matchday_gap)
+
+    # Split the edge list into index arrays
+    rows = np.array([node_index[edge[0]] for edge in edges], dtype=np.int64)
+    cols = np.array([node_index[edge[1]] for edge in edges], dtype=np.int64)
+    snap = np.array(snapshot_index, dtype=np.int64)
+    data = np.array([edge[3] if len(edge) > 3 else 1 for edge in edges], dtype=float)
+
+    # An undirected edge connects both ways
+    if not directed:
+        loops = rows == cols
+        rows, cols = np.concatenate([rows, cols[~loops]]), np.concatenate([cols, rows[~loops]])
+        snap = np.concatenate([snap, snap[~loops]])
+        data = np.concatenate([data, data[~loops]])
+
+    # Group the edges by snapshot once instead of filtering per snapshot
+    order = np.argsort(snap, kind='stable')
+    rows, cols, snap, data = rows[order], cols[order], snap[order], data[order]
+    bounds = np.searchsorted(snap, np.arange(len(labels) + 1))
+
+    # Build each snapshot, summing repeated edges within the same snapshot
+    snapshots = []
+    for t in range(len(labels)):
+        lo, hi = bounds[t], bounds[t + 1]
+        snapshots.append(sp.csr_matrix((data[lo:hi], (rows[lo:hi], cols[lo:hi])), shape=(N, N)))
+
+    return snapshots, nodes, labels
+
+def graph_to_snapshots(G, resolution='day', time_attr='time', weight=None, season_start=7, matchday_gap=1):
+    '''Function to convert a networkx temporal graph into a stack of sparse adjacency snapshots.
+
+       Input: G - the graph, resolution - 'day', 'matchday' or 'season', time_attr - the attribute storing the time information,
+              weight - the edge attribute to use as weight (None counts each edge as 1),
+              season_start - the month a season starts in, matchday_gap - the largest gap in days within a matchday (see snapshot_labels).
+
+       Output: A list of CSR adjacency matrices (one per snapshot), the list of nodes (row/column order) and the list of snapshot labels.
+    '''
+
+    # Keep isolated nodes so the matrices line up with the graph
+    nodes = sorted(G.nodes())
+
+    return build_snapshots(temporal_edge_list(G, time_attr, weight), resolution, G.is_directed(), nodes, season_start, matchday_gap)
+
+def aggregate_snapshots(snapshots, start=0, end=None, binary=False):
+    '''Function to aggregate a range of snapshots into a single static adjacency matrix.
+
+       Input: snapshots - the list of CSR snapshots, start - the index of the first snapshot, end - the index after the last snapshot (None for all),
+              binary - whether to only keep if an edge occurred instead of how often.
+
+       Output: The aggregated CSR adjacency matrix.
+    '''
+
+    # Sum the selected snapshots in one go
+    window = snapshots[start:end]
+    if not window:
+        raise ValueError('no snapshots in the range [{}, {})'.format(start, end))
+    A = sp.csr_matrix(sum(window[1:], window[0]))
+
+    # Drop the counts and keep a 0/1 adjacency matrix
+    if binary:
+        A.data = np.ones_like(A.data)
+
+    return A
+
+def snapshot_activity(snapshots, directed=True):
+    '''Function to calculate the number of edges in each snapshot.
+
+       Input: snapshots - the list of CSR snapshots, directed - whether the snapshots were built from directed edges.
+
+       Output: A numpy array with the total edge weight of each snapshot.
+    '''
+
+    # Undirected edges are stored in both directions, so count them only once (self-loops are stored once)
+    if not directed:
+        return np.array([(A.sum() + A.diagonal().sum()) / 2 for A in snapshots])
+
+    return np.array([A.sum() for A in snapshots])
+
+def temporal_reachability(snapshots, start=0, end=None):
+    '''Function to calculate which nodes can reach each other through time-respecting paths.
+
+       Input: snapshots - the list of CSR snapshots, start - the index of the first snapshot, end - the index after the last snapshot (None for all).
+
+       Output: A boolean CSR matrix where entry (i, j) is True if node j can be reached from node i (every node reaches itself).
+
+       A path may use at most one edge per snapshot, so the reachability is the boolean product of (I + A_t) over the snapshots in order.
+       At day resolution this equals find_reachable_nodes in Temporal_Metrics.py only when the times are date-only (all at midnight),
+       as find_reachable_nodes allows several hops within one day when the edge times increase.
+    '''
+
+    # Every node starts by reaching only itself
+    window = snapshots[start:end]
+    if not window:
+        raise ValueError('no snapshots in the range [{}, {})'.format(start, end))
+    N = window[0].shape[0]
+    R = sp.identity(N, dtype=bool, format='csr')
+
+    # Extend the reachable set with the edges of each snapshot in chronological order
+    for A in window:
+        if A.nnz == 0:
+            continue
+        R = R + R @ (A != 0)
+
+    return sp.csr_matrix(R)
+
+def snapshot_reachability_ratio(snapshots):
+    '''Function to calculate the reachability ratio of a stack of snapshots.
+
+       Input: snapshots - the list of CSR snapshots.
+
+       Output: The fraction of ordered node pairs connected by a time-respecting path.
+
+       Like temporal_reachability, this equals calculate_reachability_ratio in Temporal_Metrics.py only for date-only times at day resolution.
+    '''
+
+    # Count the reachable pairs, excluding each node reaching itself
+    if not snapshots:
+        raise ValueError('no snapshots to calculate the reachability ratio of')
+    N = snapshots[0].shape[0]
+    if N < 2:
+        raise ValueError('the reachability ratio needs at least 2 nodes, got {}'.format(N))
+    R = temporal_reachability(snapshots)
+    reachable_pairs = R.nnz - R.diagonal().sum()
+
+    return reachable_pairs / (N * (N - 1))
+
+def snapshot_to_networkx(A, nodes, directed=True):
+    '''Function to convert a sparse adjacency matrix back into a networkx graph.
+
+       Input: A - the CSR adjacency matrix (a snapshot or an aggregate), nodes - the list of nodes (row/column order), directed - whether to build a directed graph.
+
+       Output: A networkx graph with the matrix entries as the 'weight' edge attribute.
+    '''
+
+    # Build the graph on integer indices and relabel them with the node names
+    G = nx.from_scipy_sparse_array(A, create_using=nx.DiGraph if directed else nx.Graph)
+
+    return nx.relabel_nodes(G, dict(enumerate(nodes)))